@@ -0,0 +1,30 @@
+# """
+# Created on: see version log.
+# @author: RiGonz
+# coding: utf-8
+# One-off preprocessing for the survival webpage (app.py): converts the csv
+# from script #252 into an npz with the app-ready float32 matrix ('dat',
+# already divided by 100000) and its YYYY-GG-S keys ('keys').
+# Parsing the csv is the largest cold-start cost of the app; loading the npz
+# takes milliseconds. Re-run this script whenever the csv changes.
+#
+# Version log.
+# R0 20260901
+# - first version.
+# TODO:
+# -
+# """
+# %% Import libraries.
+import numpy as np
+import pandas as pd
+
+# %% Convert.
+fname = '252_Survival_data_ESP'
+dat_df = pd.read_csv(fname + '.csv', index_col=0, engine='c',
+                     dtype={str(k): np.float32 for k in range(100+1)})
+# The keys go as a fixed-width unicode array: an object array would need
+# allow_pickle=True on load.
+np.savez_compressed(fname + '.npz',
+                    dat=dat_df.to_numpy() / np.float32(100000.0),
+                    keys=dat_df.index.to_numpy(dtype=np.str_))
+print(f'{fname}.npz written: {dat_df.shape[0]} keys x {dat_df.shape[1]} ages.')
@@ -1,181 +1,328 @@
-# """
-# Created on: see version log.
-# @author: RiGonz
-# coding: utf-8
-# This script reads input from the user and plots the estimated probability of
-# survival from life tables applicable to Spain.
-# The input data is:
-#     - sex,
-#     - age,
-#     - year of calculation,
-#     - province (if detailed data is available for the year, otherwise for ESP).
-# The plot includes two parts:
-#     - the survival function until the input age,
-#     - the conditional probability of reaching an older age.
-# The script is the core of a dynamic webpage (Shiny).
-# Based on script #260 from CENSOS, adapted to an HTML output.
-#
-# Version log.
-# R0 20241002
-# - first trials, seems to work well (local python).
-# R1 20241005
-# - input files are json instead of pkl
-# - moved to web (via bottle)
-# R2 20241201
-# - moved to web (via Shiny)
-# - input file is npy instead of json
-# R3 20241210
-# - input file is a single csv dataframe instead of npy, with age as columns and a combined index YYYY-GG-S.
-# TODO:
-# -
-# """
-# %% Import libraries.
-from shiny import App, render, ui
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-
-
-# %% Local functions.
-def f_create_chart(dat_df, sex, age, yea, geo):
-    """
-    Generates a two vertical axes chart with survival probabilities.
-    The first part plots an absolute survival rate: the probability of
-    exceeding a given age. The second shows a conditional probability: if a
-    given age is reached, the probability of dying at any greater age.
-    Receives:
-    - dat_df, a df with national and provincial survival data (with index a YYYY-GG-S code
-    and columns 0-100 years of age; before 1975 only YYYY-00-S is available),
-    - sex, str [M, F, T],
-    - age, int [0-99],
-    - yea, int [1900-2022],
-    - geo, str (the 2-digit code of the provinces, acc. to INE, plus a 3-char code,
-           or 00-ESP for Spain)
-    Returns:
-    - the chart.
-    Uses:
-    - matplotlib.pyplot as plt
-    - math.ceil
-    """
-    fig, ax1 = plt.subplots()
-    plt.figure(dpi=500, figsize=(10, 8), layout='constrained')
-
-    # Absolute probability of exceedance:
-    sur0_s = dat_df.loc[str(yea) + '-' + geo[0:2] + '-' + sex] / 100000
-    ax1.plot(range(age+1), sur0_s[0: age+1], c='r', lw=1)
-    ax1.plot(range(age, 100+1), sur0_s.iloc[age:], c='r', lw=0.5, ls='--')
-    ax1.plot([age, age], [0, sur0_s.iloc[age]], c='k', lw=0.5, ls='--')
-
-    # Conditional probability of death:
-    sur1_s = -sur0_s.diff()
-    sur2_s = sur1_s / sur1_s[age+1:].sum()
-    ax2 = ax1.twinx()
-    for idx in range(age+1, 100+1):
-        ax2.plot([idx, idx], [0, sur2_s.iloc[idx-1]], c='b', lw=1)
-
-    # Commons:
-    # fig.tight_layout()
-    ax1.set_title(f'año: {yea}, sexo: {sex}, edad: {age}, geo: {geo}', loc='right')
-    ax1.set_xlabel('Edad')
-    ax1.set_ylabel('Probabilidad de exceder', color='r')
-    ax2.set_ylabel('Probabilidad condicional', color='b')
-    ax1.tick_params(axis='y', labelcolor='r')
-    ax2.tick_params(axis='y', labelcolor='b')
-    ax1.set_ylim(0, 1)
-    ax2.set_ylim(0, 0.05*np.ceil(sur2_s[age+1:].max() / 0.05))
-    ax1.set_xticks(range(0, 100+1, 10))
-    ax1.set_yticks([x/100 for x in range(0, 100+1, 10)])
-    ax1.grid(which='both', alpha=0.5, linewidth=0.2, color='grey')
-
-    return fig
-
-
-# %% Common auxiliaries.
-cod2pro_d = {
-    '01': 'ALA', '02': 'ALB', '03': 'ALI', '04': 'ALM', '05': 'AVI',
-    '06': 'BAD', '07': 'BAL', '08': 'BAR', '09': 'BUR', '10': 'CAC',
-    '11': 'CAD', '12': 'CAS', '13': 'CIU', '14': 'COR', '15': 'LAC',
-    '16': 'CUE', '17': 'GER', '18': 'GRA', '19': 'GUA', '20': 'GUI',
-    '21': 'HUL', '22': 'HUE', '23': 'JAE', '24': 'LEO', '25': 'LER',
-    '26': 'RIO', '27': 'LUG', '28': 'MAD', '29': 'MAL', '30': 'MUR',
-    '31': 'NAV', '32': 'ORE', '33': 'AST', '34': 'PAL', '35': 'PLM',
-    '36': 'PON', '37': 'SAL', '38': 'TEN', '39': 'CAN', '40': 'SEG',
-    '41': 'SEV', '42': 'SOR', '43': 'TAR', '44': 'TER', '45': 'TOL',
-    '46': 'VLC', '47': 'VLL', '48': 'VIZ', '49': 'ZAM', '50': 'ZAR',
-    '00': 'ESP'}
-
-# %% Read survival data, from script #252.
-# Get data:
-# RootDir = 'E:/0 DOWN/00 PY RG/HTML/SHINY/CENSOS/'
-# fname = RootDir + '252_Survival_data_ESP.csv'
-fname = '252_Survival_data_ESP.csv'
-dat_df = pd.read_csv(fname, index_col=0)
-# del RootDir
-del fname
-
-# %% UI definition.
-ui.head_content(
-    ui.tags.meta(name="robots", content="noindex"))
-
-app_ui = ui.page_fluid(
-    ui.panel_title(ui.h2("TABLAS DE MORTALIDAD EN ESPAÑA, 1900-2022")),
-    ui.row(
-        ui.card(
-            ui.h3("""Presentación"""),
-            ui.HTML("""
-                <p>Las tablas de mortalidad (o supervivencia, <i>life tables</i>) ofrecen una visión estadística de las tasas de deceso en función de la edad. Es a partir de ellas que se calculan las esperanzas de vida al nacer, o a cualquier otra edad.</p>
-                <p>En España disponemos de tablas detalladas que cubren el período 1900-2022 a nivel nacional, y desde 1975 para las provincias.</p>
-                <p>Además del interés personal, quizás morboso, de ver la duración esperada de vida que le queda a uno, esta serie de tablas permite multiples comparaciones a varios niveles: temporal, vital, biológico y geográfico. A un igualitarista racionalista y riguroso hasta le podrían servir para deducir que quizás convenga ralentizar el estudio de enfermedades severas exclusivas de mujeres, o de mayor prevalencia en ese sexo, hasta igualar, a la baja, su esperanza de vida con la del hombre.</p>
-                <p>Esta aplicación permite visualizar dos grupos de resultados:</p>
-                <ul>
-                    <li>la probabilidad de exceder una edad determinada, y,</li>
-                    <li>bajo la condición de haber alcanzado esa edad, la probabilidad de deceso a edades superiores.</li>
-                </ul>
-                <p>Los resultados dependen de cuatro parámetros:</p>
-                <ol>
-                    <li>sexo,</li>
-                    <li>edad de cálculo,</li>
-                    <li>año de cómputo, y</li>
-                    <li>ámbito geográfico.</li>
-                </ol>
-                <p>Para los datos 1-3 el formulario de entrada guía al usuario; con respecto al ámbito geográfico debe introducirse un código numérico: 0 para España o, a partir de 1975, el código de dos dígitos asignado por el INE para las provincias (<a href="https://www.ine.es/daco/daco42/codmun/cod_provincia_estandar.htm">INE</a>).</p>
-                <p>Los datos originales son del INE (<a href="https://www.ine.es/inebaseweb/libros.do?tntp=206842">ESP 1900-1970</a>, <a href="https://www.ine.es/jaxiT3/Tabla.htm?t=27150">ESP 1975-90</a>, <a href="https://www.ine.es/jaxiT3/Tabla.htm?t=27153">ESP 1991-2022</a>, <a href="https://www.ine.es/jaxiT3/Tabla.htm?t=27152">PRO 1975-90</a>, <a href="https://www.ine.es/jaxiT3/Tabla.htm?t=27155">PRO 1991-2022</a>). Con los anteriores a 1990 he tenido que interpolar y extrapolar por diferentes motivos para conseguir mallas de 1 año tanto en edades como en fechas. Algunas extrapolaciones, especialmente en el período 1975-90 para edades superiores a 85 años, no parecen demasiado buenas, pero tampoco creo que esto sea algo gravísimo para los propósitos de esta página.</p>
-                <p>Una asunción subyacente quizás merezca un comentario adicional. Las tablas de supervivencia se interpretan naturalmente como el seguimiento longitudinal de cohortes hasta su extinción. Naturalmente también, esto no es viable porque no conviene esperar unos 100 años para poder construir cada tabla. La alternativa es el uso de cohortes sintéticas bajo la hipótesis de estabilidad demográfica; es decir, la tabla del año, digamos, 2022 está construida bajo la asunción de que las condiciones prevalentes en 2022 persisten hasta la extinción de la cohorte correspondiente a ese año.</p>
-                <p>La idea original viene de <a href="https://flowingdata.com/2015/09/23/years-you-have-left-to-live-probably/">flowingdata</a>, aunque estaba buscando una excusa para hacer ¡mi primera! página web dinámica. Una primera versión apareció en <a href="https://rigonz.pythonanywhere.com/">pythonanywhere</a>; esta en Shiny es algo más pintona, pero el núcleo no ha cambiado.</p>
-                <p>Mantengo el <i>caveat</i> principal: la página no está pensada para dispositivos <i>móviles</i>.</p>"""
-            )
-        )
-    ),
-    ui.row(
-        ui.column(3,
-            ui.h3("""Datos de entrada"""),
-            ui.input_select("sex", "Sexo:", choices={'M': 'hombre', 'F': 'mujer', 'T': 'todos'}, width='150px'),
-            ui.input_numeric("age", "Edad (0-99):", value=50, min=0, max=99, step=1, width='150px'),
-            ui.input_numeric("yea", "Año (1900-2022):", value=2022, min=1900, max=2022, step=1, width='150px'),
-            ui.input_numeric("geo", "Geografía:", value=50, min=0, max=50, step=1, width='150px'),
-        ),
-        ui.column(9,
-            ui.h3("""Resultados"""),
-            ui.output_plot("plot")
-        ),
-    )
-)
-
-
-# %% Serder definition.
-def server(input, output, session):
-    @render.plot(width=800)
-    def plot():
-        sex = input.sex()
-        age = int(input.age())
-        yea = int(input.yea())
-        geo = int(input.geo())
-        if yea < 1975:
-            geo = 0
-        geo_s = str(geo).zfill(2)
-        geo_s += '-' + cod2pro_d[geo_s]
-        fig = f_create_chart(dat_df, sex, age, yea, geo_s)
-        return fig
-
-
-app = App(app_ui, server)
+# """
+# Created on: see version log.
+# @author: RiGonz
+# coding: utf-8
+# This script reads input from the user and plots the estimated probability of
+# survival from life tables applicable to Spain.
+# The input data is:
+#     - sex,
+#     - age,
+#     - year of calculation,
+#     - province (if detailed data is available for the year, otherwise for ESP).
+# The plot includes two parts:
+#     - the survival function until the input age,
+#     - the conditional probability of reaching an older age.
+# The script is the core of a dynamic webpage (Shiny).
+# Based on script #260 from CENSOS, adapted to an HTML output.
+#
+# Version log.
+# R0 20241002
+# - first trials, seems to work well (local python).
+# R1 20241005
+# - input files are json instead of pkl
+# - moved to web (via bottle)
+# R2 20241201
+# - moved to web (via Shiny)
+# - input file is npy instead of json
+# R3 20241210
+# - input file is a single csv dataframe instead of npy, with age as columns and a combined index YYYY-GG-S.
+# R4 20260901
+# - the survival series are memoized by (year, geo, sex): repeated queries
+#   (e.g. the user playing with the age) skip the df lookup and the diffs.
+# - the df is unpacked at startup into a dict of numpy rows: no pandas left
+#   in the render path, only in the CSV ingestion.
+# - the table is kept as a single float32 matrix plus a key->row dict, which
+#   halves its memory; the values are only plotted, so the precision is enough.
+# - removed an orphan plt.figure() that was allocated per render and never
+#   drawn; its params go to plt.subplots directly, minus the excessive dpi
+#   (the plot is shown at 800px anyway) and the layout engine (shiny forces
+#   tight and warns about constrained).
+# - render resolution aligned with the display: figsize 8x6 at dpi 100 is
+#   exactly the 800px the output plot is shown at.
+# - one figure per session instead of one per render: f_create_chart becomes
+#   f_update_chart, which clears and redraws the session's axes.
+# - the tail maxima join the memoized series, so the right y-axis ceiling is
+#   a lookup instead of a max over a slice on every render.
+# - the artists and the static dressing persist across renders (f_init_chart);
+#   each render only updates data, title and the right y-limit.
+# - the x coordinates and ticks come from cached module-level arrays instead
+#   of per-render range objects.
+# - the csv is parsed straight to float32 (C engine), skipping the float64
+#   intermediate df at startup.
+# - the table is served from a preprocessed npz (see the companion script
+#   252_Survival_data_to_npz.py); the csv parse stays as a fallback.
+# - the figure is built directly on an Agg canvas, without pyplot: no global
+#   figure manager, nothing to deregister when the session ends.
+# - the matrix groups the three sex variants per (year, geo): toggling the
+#   sex reads a contiguous block instead of a distant row.
+# - the presentation text moves to a module-level constant, out of the
+#   app_ui expression.
+# - the province codes become a tuple indexed by the geo input: no zfill and
+#   no dict hash per render.
+# TODO:
+# -
+# """
+# %% Import libraries.
+from functools import lru_cache
+
+from shiny import App, render, ui
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+# %% Local functions.
+@lru_cache(maxsize=512)
+def f_get_survival(yea, geo2, sex):
+    """
+    Returns the survival series for a (year, geo, sex) combination.
+    The result is memoized: the same combination is queried repeatedly while
+    the user plays with the age input, and the df lookup plus the derived
+    series are not worth recomputing every time.
+    Receives:
+    - yea, int [1900-2022],
+    - geo2, str (the 2-digit code of the provinces, acc. to INE, or 00 for Spain),
+    - sex, str [M, F, T].
+    Returns:
+    - sur0, array (101,) with the probability of exceeding each age,
+    - sur1, array (101,) with the probability of death at each age (0 at age 0),
+    - cumtail, array (101,) with the tail sums of sur1 (cumtail[k] = sur1[k:].sum()),
+    - tailmax, array (101,) with the tail maxima of sur1 (tailmax[k] = sur1[k:].max()).
+    Uses:
+    - dat_a, yg2row_d and sex2col_d, the survival matrix and its indices
+      built at startup.
+    """
+    sur0 = dat_a[yg2row_d[f'{yea}-{geo2}'], sex2col_d[sex]]
+    # sur1[k] = sur0[k-1] - sur0[k], computed in place (no -np.diff temps):
+    sur1 = np.empty_like(sur0)
+    sur1[0] = 0
+    np.subtract(sur0[:-1], sur0[1:], out=sur1[1:])
+    cumtail = sur1[::-1].cumsum()[::-1]
+    tailmax = np.maximum.accumulate(sur1[::-1])[::-1]
+    return sur0, sur1, cumtail, tailmax
+
+
+def f_init_chart():
+    """
+    Creates the per-session figure with its two (twinned) axes and the four
+    persistent artists, and applies the dressing that does not depend on the
+    user input. Only the artist data, the title and the right y-limit change
+    between renders (see f_update_chart).
+    Receives: nothing.
+    Returns:
+    - a tuple (fig, ax1, ax2, line_sol, line_dsh, line_mrk, vlines_c).
+    Uses:
+    - matplotlib Figure and FigureCanvasAgg (no pyplot: the figure belongs
+      to the session, not to a global manager, and is freed with it).
+    """
+    fig = Figure(figsize=(8, 6), dpi=100)
+    FigureCanvasAgg(fig)
+    ax1 = fig.add_subplot()
+    ax2 = ax1.twinx()
+
+    # Empty artists, filled on each render:
+    line_sol, = ax1.plot([], [], c='r', lw=1)
+    line_dsh, = ax1.plot([], [], c='r', lw=0.5, ls='--')
+    line_mrk, = ax1.plot([], [], c='k', lw=0.5, ls='--')
+    vlines_c = ax2.vlines([], 0, [], colors='b', lw=1)
+
+    # Commons, set once:
+    ax1.set_xlabel('Edad')
+    ax1.set_ylabel('Probabilidad de exceder', color='r')
+    ax2.set_ylabel('Probabilidad condicional', color='b')
+    ax1.tick_params(axis='y', labelcolor='r')
+    ax2.tick_params(axis='y', labelcolor='b')
+    ax1.set_ylim(0, 1)
+    ax1.set_xticks(xticks_a)
+    ax1.set_yticks(yticks_a)
+    ax1.grid(which='both', alpha=0.5, linewidth=0.2, color='grey')
+
+    return fig, ax1, ax2, line_sol, line_dsh, line_mrk, vlines_c
+
+
+def f_update_chart(chart, sur0, sur1, cumtail, tailmax, sex, age, yea, geo):
+    """
+    Redraws the two vertical axes chart with survival probabilities by
+    updating the persistent artists of f_init_chart (no artist creation).
+    The first part plots an absolute survival rate: the probability of
+    exceeding a given age. The second shows a conditional probability: if a
+    given age is reached, the probability of dying at any greater age.
+    Receives:
+    - chart, the per-session tuple returned by f_init_chart,
+    - sur0, sur1, cumtail, tailmax, the survival series from f_get_survival,
+    - sex, str [M, F, T],
+    - age, int [0-99],
+    - yea, int [1900-2022],
+    - geo, str (the 2-digit code of the provinces, acc. to INE, plus a 3-char code,
+           or 00-ESP for Spain)
+    Returns:
+    - the chart figure.
+    Uses:
+    - math.ceil
+    """
+    fig, ax1, ax2, line_sol, line_dsh, line_mrk, vlines_c = chart
+
+    # Shiny ends every render by scaling the figure dpi to the client pixel
+    # ratio and reads the scaled value back on the next one; restore the
+    # canonical geometry so the scaling cannot compound on a reused figure:
+    fig.set_size_inches(8, 6)
+    fig.set_dpi(100)
+
+    # Absolute probability of exceedance:
+    line_sol.set_data(ages_a[0: age+1], sur0[0: age+1])
+    line_dsh.set_data(ages_a[age:], sur0[age:])
+    line_mrk.set_data([age, age], [0, sur0[age]])
+
+    # Conditional probability of death:
+    sur2 = sur1 / cumtail[age+1]
+    segs = np.zeros((100-age, 2, 2))
+    segs[:, 0, 0] = segs[:, 1, 0] = ages_a[age+1:]
+    segs[:, 1, 1] = sur2[age:100]
+    vlines_c.set_segments(segs)
+
+    # Rescale x to the new data (y limits are fixed or set below):
+    ax1.relim()
+    ax1.autoscale_view(scaley=False)
+
+    ax1.set_title(f'año: {yea}, sexo: {sex}, edad: {age}, geo: {geo}', loc='right')
+    ax2.set_ylim(0, 0.05*np.ceil(tailmax[age+1] / cumtail[age+1] / 0.05))
+
+    return fig
+
+
+# %% Common auxiliaries.
+# The x coordinates never change: slice one cached array instead of building
+# range objects per render (matplotlib converts them to ndarray anyway).
+ages_a = np.arange(100+1)
+xticks_a = np.arange(0, 100+1, 10)
+yticks_a = np.linspace(0, 1, 11)
+
+# Indexed directly by the geo input (0 for Spain, 1-50 the INE codes):
+cod2pro_t = (
+    'ESP',
+    'ALA', 'ALB', 'ALI', 'ALM', 'AVI',
+    'BAD', 'BAL', 'BAR', 'BUR', 'CAC',
+    'CAD', 'CAS', 'CIU', 'COR', 'LAC',
+    'CUE', 'GER', 'GRA', 'GUA', 'GUI',
+    'HUL', 'HUE', 'JAE', 'LEO', 'LER',
+    'RIO', 'LUG', 'MAD', 'MAL', 'MUR',
+    'NAV', 'ORE', 'AST', 'PAL', 'PLM',
+    'PON', 'SAL', 'TEN', 'CAN', 'SEG',
+    'SEV', 'SOR', 'TAR', 'TER', 'TOL',
+    'VLC', 'VLL', 'VIZ', 'ZAM', 'ZAR')
+
+# %% Read survival data, from script #252.
+# Get data:
+# RootDir = 'E:/0 DOWN/00 PY RG/HTML/SHINY/CENSOS/'
+# fname = RootDir + '252_Survival_data_ESP'
+fname = '252_Survival_data_ESP'
+# The npz (written by 252_Survival_data_to_npz.py) loads in milliseconds and
+# already holds the pre-divided float32 matrix; the csv parse is only kept as
+# a fallback in case the npz has not been generated.
+try:
+    with np.load(fname + '.npz') as npz:
+        dat_a = npz['dat']
+        keys = npz['keys']
+except FileNotFoundError:
+    # Parse straight to float32 with the C engine: no float64 intermediate
+    # df. The dtype is given per age column (a plain dtype would also hit
+    # the YYYY-GG-S index column and fail).
+    dat_df = pd.read_csv(fname + '.csv', index_col=0, engine='c',
+                         dtype={str(k): np.float32 for k in range(100+1)})
+    dat_a = dat_df.to_numpy() / np.float32(100000.0)
+    keys = dat_df.index.to_numpy()
+    del dat_df
+# Stack the three sex variants of each (year, geo) into one (N, 3, 101)
+# block: toggling the sex while keeping year/geo fixed (a common interaction)
+# then reads a contiguous, cache-hot row.
+sex2col_d = {'M': 0, 'F': 1, 'T': 2}
+yg2row_d = {}
+for key in keys:
+    yg2row_d.setdefault(key.rsplit('-', 1)[0], len(yg2row_d))
+# nan-filled so a (year, geo) group missing a sex variant would plot blank
+# instead of serving uninitialized memory:
+dat_a3 = np.full((len(yg2row_d), 3, 100+1), np.nan, dtype=np.float32)
+for idx, key in enumerate(keys):
+    yg, sex = key.rsplit('-', 1)
+    dat_a3[yg2row_d[yg], sex2col_d[sex]] = dat_a[idx]
+dat_a = dat_a3
+del dat_a3
+del keys
+# del RootDir
+del fname
+
+# %% UI definition.
+ui.head_content(
+    ui.tags.meta(name="robots", content="noindex"))
+
+# The presentation text is a fixed literal: keep it as a module-level
+# constant, allocated once at import (and never an f-string by accident).
+presentation_html = """
+                <p>Las tablas de mortalidad (o supervivencia, <i>life tables</i>) ofrecen una visión estadística de las tasas de deceso en función de la edad. Es a partir de ellas que se calculan las esperanzas de vida al nacer, o a cualquier otra edad.</p>
+                <p>En España disponemos de tablas detalladas que cubren el período 1900-2022 a nivel nacional, y desde 1975 para las provincias.</p>
+                <p>Además del interés personal, quizás morboso, de ver la duración esperada de vida que le queda a uno, esta serie de tablas permite multiples comparaciones a varios niveles: temporal, vital, biológico y geográfico. A un igualitarista racionalista y riguroso hasta le podrían servir para deducir que quizás convenga ralentizar el estudio de enfermedades severas exclusivas de mujeres, o de mayor prevalencia en ese sexo, hasta igualar, a la baja, su esperanza de vida con la del hombre.</p>
+                <p>Esta aplicación permite visualizar dos grupos de resultados:</p>
+                <ul>
+                    <li>la probabilidad de exceder una edad determinada, y,</li>
+                    <li>bajo la condición de haber alcanzado esa edad, la probabilidad de deceso a edades superiores.</li>
+                </ul>
+                <p>Los resultados dependen de cuatro parámetros:</p>
+                <ol>
+                    <li>sexo,</li>
+                    <li>edad de cálculo,</li>
+                    <li>año de cómputo, y</li>
+                    <li>ámbito geográfico.</li>
+                </ol>
+                <p>Para los datos 1-3 el formulario de entrada guía al usuario; con respecto al ámbito geográfico debe introducirse un código numérico: 0 para España o, a partir de 1975, el código de dos dígitos asignado por el INE para las provincias (<a href="https://www.ine.es/daco/daco42/codmun/cod_provincia_estandar.htm">INE</a>).</p>
+                <p>Los datos originales son del INE (<a href="https://www.ine.es/inebaseweb/libros.do?tntp=206842">ESP 1900-1970</a>, <a href="https://www.ine.es/jaxiT3/Tabla.htm?t=27150">ESP 1975-90</a>, <a href="https://www.ine.es/jaxiT3/Tabla.htm?t=27153">ESP 1991-2022</a>, <a href="https://www.ine.es/jaxiT3/Tabla.htm?t=27152">PRO 1975-90</a>, <a href="https://www.ine.es/jaxiT3/Tabla.htm?t=27155">PRO 1991-2022</a>). Con los anteriores a 1990 he tenido que interpolar y extrapolar por diferentes motivos para conseguir mallas de 1 año tanto en edades como en fechas. Algunas extrapolaciones, especialmente en el período 1975-90 para edades superiores a 85 años, no parecen demasiado buenas, pero tampoco creo que esto sea algo gravísimo para los propósitos de esta página.</p>
+                <p>Una asunción subyacente quizás merezca un comentario adicional. Las tablas de supervivencia se interpretan naturalmente como el seguimiento longitudinal de cohortes hasta su extinción. Naturalmente también, esto no es viable porque no conviene esperar unos 100 años para poder construir cada tabla. La alternativa es el uso de cohortes sintéticas bajo la hipótesis de estabilidad demográfica; es decir, la tabla del año, digamos, 2022 está construida bajo la asunción de que las condiciones prevalentes en 2022 persisten hasta la extinción de la cohorte correspondiente a ese año.</p>
+                <p>La idea original viene de <a href="https://flowingdata.com/2015/09/23/years-you-have-left-to-live-probably/">flowingdata</a>, aunque estaba buscando una excusa para hacer ¡mi primera! página web dinámica. Una primera versión apareció en <a href="https://rigonz.pythonanywhere.com/">pythonanywhere</a>; esta en Shiny es algo más pintona, pero el núcleo no ha cambiado.</p>
+                <p>Mantengo el <i>caveat</i> principal: la página no está pensada para dispositivos <i>móviles</i>.</p>"""
+
+app_ui = ui.page_fluid(
+    ui.panel_title(ui.h2("TABLAS DE MORTALIDAD EN ESPAÑA, 1900-2022")),
+    ui.row(
+        ui.card(
+            ui.h3("""Presentación"""),
+            ui.HTML(presentation_html)
+        )
+    ),
+    ui.row(
+        ui.column(3,
+            ui.h3("""Datos de entrada"""),
+            ui.input_select("sex", "Sexo:", choices={'M': 'hombre', 'F': 'mujer', 'T': 'todos'}, width='150px'),
+            ui.input_numeric("age", "Edad (0-99):", value=50, min=0, max=99, step=1, width='150px'),
+            ui.input_numeric("yea", "Año (1900-2022):", value=2022, min=1900, max=2022, step=1, width='150px'),
+            ui.input_numeric("geo", "Geografía:", value=50, min=0, max=50, step=1, width='150px'),
+        ),
+        ui.column(9,
+            ui.h3("""Resultados"""),
+            ui.output_plot("plot")
+        ),
+    )
+)
+
+
+# %% Serder definition.
+def server(input, output, session):
+    # One figure per session, with persistent artists updated on each render:
+    # building a fresh Figure+Axes pair per interaction is the dominant fixed
+    # cost.
+    chart = f_init_chart()
+
+    @render.plot(width=800)
+    def plot():
+        sex = input.sex()
+        age = int(input.age())
+        yea = int(input.yea())
+        geo = int(input.geo())
+        if yea < 1975:
+            geo = 0
+        geo_s = f'{geo:02d}-{cod2pro_t[geo]}'
+        sur0, sur1, cumtail, tailmax = f_get_survival(yea, geo_s[0:2], sex)
+        return f_update_chart(chart, sur0, sur1, cumtail, tailmax,
+                              sex, age, yea, geo_s)
+
+
+app = App(app_ui, server)